@@ -1,313 +1,462 @@
-###
-# File: json_handler.py
-# Description: Disk-backed company bundles. Handles reading/writing JSON for each company in data/{company_id}_data.json.
-###
-
-from __future__ import annotations
-import os
-import json
-import tempfile
-import time
-from datetime import datetime, timezone
-from typing import Any, Dict, List
-
-from utils.dataframe_utils import CATEGORY_NAMES
-from api import (
-    get_companies,
-    get_domains,
-    get_company_risk_grade,
-    get_category_gpa,
-    get_domain_score,
-    get_findings_by_category,
-)
-
-DATA_ROOT = os.getenv("DATA_DIR", "data")
-
-
-# --------------------------- small fs helpers --------------------------------
-def _ensure_dir():
-    """Ensure data directory exists"""
-    os.makedirs(DATA_ROOT, exist_ok=True)
-
-
-def _atomic_write_json(path: str, data: dict):
-    """Write JSON atomically to disk"""
-    d = os.path.dirname(path)
-    os.makedirs(d, exist_ok=True)
-    fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=d, text=True)
-    try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        os.replace(tmp, path)
-    finally:
-        if os.path.exists(tmp):
-            try:
-                os.remove(tmp)
-            except Exception:
-                pass
-
-
-def _strip_transport(obj: Any) -> Any:
-    """Recursively remove transport/meta keys from dict/list"""
-    if isinstance(obj, dict):
-        out = {}
-        for k, v in obj.items():
-            kl = str(k).lower()
-            if kl in ("href", "links", "link", "rel"):
-                continue
-            out[k] = _strip_transport(v)
-        return out
-    if isinstance(obj, list):
-        return [_strip_transport(x) for x in obj]
-    return obj
-
-
-def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
-# --------------------------- bundle build/load --------------------------------
-def company_bundle_path(company_id: Any) -> str:
-    """data/{company_id}_data.json"""
-    return os.path.join(DATA_ROOT, f"{company_id}_data.json")
-
-
-def load_company_bundle(company_id: Any) -> dict:
-    path = company_bundle_path(company_id)
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-
-def list_company_bundles() -> List[dict]:
-    _ensure_dir()
-    out = []
-    for name in sorted(os.listdir(DATA_ROOT)):
-        if not name.endswith("_data.json"):
-            continue
-        full = os.path.join(DATA_ROOT, name)
-        if not os.path.isfile(full):
-            continue
-        try:
-            with open(full, "r", encoding="utf-8") as f:
-                out.append(json.load(f))
-        except Exception:
-            pass
-    return out
-
-
-def write_company_bundle(company_id: Any, bundle: dict):
-    _ensure_dir()
-    _atomic_write_json(company_bundle_path(company_id), bundle)
-
-
-def build_company_bundle(company: dict, all_domains: List[dict]) -> dict:
-    """
-    Build a canonical bundle for a single company using live API data.
-    Includes: company record, risk grade, all category GPAs/scores,
-    company domains, per-domain score, and findings per category.
-    """
-    cid = company.get("company_id") or company.get("id")
-    if cid is None:
-        raise ValueError("Company has no ID")
-
-    # 1) company record (stripped)
-    company_clean = _strip_transport(company)
-
-    # 2) risk grade
-    risk_grade = _strip_transport(get_company_risk_grade(cid) or {})
-
-    # 3) category GPAs/scores
-    categories = []
-    for cat in CATEGORY_NAMES:
-        payload = get_category_gpa(cid, cat)
-        row = payload[0] if isinstance(payload, list) and payload else payload
-        if not isinstance(row, dict):
-            row = {"Category": cat, "category_gpa": None, "category_score": None}
-        c_name = row.get("Category") or row.get("category") or cat
-        gpa = row.get("category_gpa") or row.get("gpa") or row.get("value")
-        score = row.get("category_score") or row.get("score")
-        aggregated_at = row.get("aggregated_at") or row.get("date") or None
-        try:
-            gpa = float(gpa) if gpa is not None else None
-        except Exception:
-            gpa = None
-        try:
-            score = float(score) if score is not None else None
-        except Exception:
-            score = None
-        categories.append(
-            {
-                "Category": c_name,
-                "category_gpa": gpa,
-                "category_score": score,
-                "aggregated_at": aggregated_at,
-            }
-        )
-
-    # 4) filter all domains to this company
-    sid = str(cid)
-
-    def _dcid(d):  # flexible key
-        return d.get("company_id") or d.get("companyId") or d.get("cid")
-
-    domains_for_company = [d for d in (all_domains or []) if str(_dcid(d)) == sid]
-    domains_for_company = _strip_transport(domains_for_company)
-
-    # 5) per-domain score + findings by category
-    domain_details = []
-    for d in domains_for_company:
-        did = d.get("domain_id") or d.get("id") or d.get("domainId")
-        dname = d.get("domain_name") or d.get("domain") or d.get("name")
-        try:
-            dscore = get_domain_score(did)
-        except Exception:
-            dscore = None
-        try:
-            dscore = float(dscore) if dscore is not None else None
-        except Exception:
-            dscore = None
-
-        per_cat = {}
-        for cat in CATEGORY_NAMES:
-            raw = get_findings_by_category(did, cat)
-            if isinstance(raw, dict) and isinstance(raw.get("findings"), list):
-                rows = raw.get("findings", [])
-            elif isinstance(raw, list):
-                rows = raw
-            elif isinstance(raw, dict) and raw:
-                rows = [raw]
-            else:
-                rows = []
-            rows = [r for r in rows if isinstance(r, dict)]
-            for r in rows:
-                r.pop("Category", None)  # avoid duplication
-            per_cat[cat] = _strip_transport(rows)
-
-        domain_details.append(
-            {
-                "domain_id": did,
-                "domain_name": dname,
-                "domain_score": dscore,
-                "findings_by_category": per_cat,
-            }
-        )
-
-    bundle = {
-        "schema_version": 1,
-        "generated_at": _now_iso(),
-        "company_id": cid,
-        "company": company_clean,
-        "risk_grade": risk_grade,
-        "categories": categories,
-        "domains": domain_details,
-    }
-    return bundle
-
-
-# --- Bulk / convenience builders ---------------------------------------------
-
-
-def build_all_company_bundles() -> list[str]:
-    """
-    Build/refresh one JSON per company into data/{company_id}_data.json
-    using the live API. Returns list of written file paths.
-    """
-    _ensure_dir()
-    cs = get_companies() or []
-    all_domains = get_domains() or []
-    written = []
-    for c in cs:
-        cid = c.get("company_id") or c.get("id")
-        if cid is None:
-            continue
-        bundle = build_company_bundle(c, all_domains)
-        write_company_bundle(cid, bundle)
-        written.append(company_bundle_path(cid))
-    return written
-
-
-def ensure_initial_bundles() -> int:
-    """
-    If data/ has no *"_data.json" files, build them all once.
-    Returns the number of bundles on disk after the call.
-    """
-    existing = list_company_bundles()
-    if existing:
-        return len(existing)
-    return len(build_all_company_bundles())
-
-
-def rebuild_company_bundle_for_id(company_id: int | str) -> str | None:
-    """
-    Rebuild a single company's JSON bundle from the live API.
-    Returns the path written, or None if the company isn't found.
-    """
-    cs = get_companies() or []
-    all_domains = get_domains() or []
-    for c in cs:
-        cid = c.get("company_id") or c.get("id")
-        if str(cid) == str(company_id):
-            bundle = build_company_bundle(c, all_domains)
-            write_company_bundle(cid, bundle)
-            return company_bundle_path(cid)
-    return None
-
-
-def ensure_missing_bundles() -> int:
-    """
-    Build bundles only for companies that don't yet have data/{id}_data.json.
-    Returns how many new files were written.
-    """
-    _ensure_dir()
-    existing_ids = set(
-        name.split("_data.json")[0]
-        for name in os.listdir(DATA_ROOT)
-        if name.endswith("_data.json")
-    )
-    cs = get_companies() or []
-    all_domains = get_domains() or []
-    written = 0
-    for c in cs:
-        cid = c.get("company_id") or c.get("id")
-        if cid is None or str(cid) in existing_ids:
-            continue
-        bundle = build_company_bundle(c, all_domains)
-        write_company_bundle(cid, bundle)
-        written += 1
-    return written
-
-
-def refresh_stale_bundles(ttl_hours: int = 24) -> int:
-    """
-    Rebuild bundles whose files are older than ttl_hours.
-    Returns how many files were refreshed.
-    """
-    _ensure_dir()
-    cutoff = time.time() - ttl_hours * 3600
-    cs = get_companies() or []
-    # index companies by id for quick access
-    by_id = {str(c.get("company_id") or c.get("id")): c for c in cs}
-    all_domains = get_domains() or []
-
-    refreshed = 0
-    for name in os.listdir(DATA_ROOT):
-        if not name.endswith("_data.json"):
-            continue
-        cid = name.split("_data.json")[0]
-        fpath = os.path.join(DATA_ROOT, name)
-        try:
-            mtime = os.path.getmtime(fpath)
-        except Exception:
-            mtime = 0
-        if mtime >= cutoff:
-            continue  # fresh enough
-        comp = by_id.get(str(cid))
-        if not comp:
-            continue  # company no longer exists
-        bundle = build_company_bundle(comp, all_domains)
-        write_company_bundle(cid, bundle)
-        refreshed += 1
-    return refreshed
+###
+# File: json_handler.py
+# Description: Disk-backed company bundles. Handles reading/writing JSON for each company in data/{company_id}_data.json.
+###
+
+from __future__ import annotations
+import os
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List
+
+from utils.dataframe_utils import CATEGORY_NAMES
+from api import (
+    get_companies,
+    get_domains,
+    get_company_risk_grade,
+    get_category_gpa,
+    get_domain_score,
+    get_findings_by_category,
+)
+
+try:  # optional fast JSON codec; stdlib json is the fallback
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+DATA_ROOT = os.getenv("DATA_DIR", "data")
+_BUNDLE_SUFFIX = "_data.json"
+_FETCH_WORKERS = 16  # concurrent API requests per bundle build
+_BUILD_WORKERS = 4  # companies built concurrently by build_all_company_bundles
+
+
+# --------------------------- small fs helpers --------------------------------
+def _ensure_dir():
+    """Ensure data directory exists"""
+    os.makedirs(DATA_ROOT, exist_ok=True)
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Decode JSON bytes (orjson when available, else stdlib json)"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data: Any) -> bytes:
+    """Encode JSON as indented UTF-8 bytes (orjson when available)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; let stdlib handle it
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _read_json_file(path: str) -> Any:
+    """Read and decode a JSON file"""
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
+def _atomic_write_json(path: str, data: dict):
+    """Write JSON atomically to disk"""
+    d = os.path.dirname(path)
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=d)
+    try:
+        payload = _json_dumps(data)
+        with os.fdopen(fd, "wb", buffering=0) as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except Exception:
+                pass
+
+
+_TRANSPORT_KEYS = frozenset(("href", "links", "link", "rel"))
+
+
+def _scan_bundle_files() -> Dict[str, os.DirEntry]:
+    """Map company id -> DirEntry for each data/{company_id}_data.json file"""
+    n = len(_BUNDLE_SUFFIX)
+    with os.scandir(DATA_ROOT) as it:
+        return {
+            e.name[:-n]: e
+            for e in it
+            if e.name.endswith(_BUNDLE_SUFFIX) and e.is_file()
+        }
+
+
+def _strip_transport(obj: Any) -> Any:
+    """Recursively remove transport/meta keys from dict/list"""
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            kl = k.lower() if isinstance(k, str) else str(k).lower()
+            if kl in _TRANSPORT_KEYS:
+                continue
+            out[k] = _strip_transport(v)
+        return out
+    if isinstance(obj, list):
+        return [_strip_transport(x) for x in obj]
+    return obj
+
+
+def _domain_company_id(d: dict) -> Any:
+    """Company id of a domain record (flexible key)"""
+    return d.get("company_id") or d.get("companyId") or d.get("cid")
+
+
+def _domains_by_company(all_domains: List[dict]) -> Dict[str, List[dict]]:
+    """Group domain records by str(company id) in one pass"""
+    out: Dict[str, List[dict]] = {}
+    for d in all_domains or []:
+        out.setdefault(str(_domain_company_id(d)), []).append(d)
+    return out
+
+
+def _domain_score_or_none(domain_id: Any) -> Any:
+    """Domain score from the API, or None if the request fails"""
+    try:
+        return get_domain_score(domain_id)
+    except Exception:
+        return None
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# --------------------------- bundle build/load --------------------------------
+def company_bundle_path(company_id: Any) -> str:
+    """data/{company_id}_data.json"""
+    return os.path.join(DATA_ROOT, f"{company_id}{_BUNDLE_SUFFIX}")
+
+
+_BUNDLE_FILE_CACHE: Dict[str, tuple] = {}  # path -> ((mtime_ns, size), bundle)
+
+
+def load_company_bundle(company_id: Any) -> dict:
+    """
+    Parsed bundle for one company, re-read only when the file's
+    (mtime_ns, size) changes. The returned dict is shared: treat it as read-only.
+    """
+    path = company_bundle_path(company_id)
+    try:
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        hit = _BUNDLE_FILE_CACHE.get(path)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        bundle = _read_json_file(path)
+    except Exception:
+        _BUNDLE_FILE_CACHE.pop(path, None)
+        return {}
+    _BUNDLE_FILE_CACHE[path] = (key, bundle)
+    return bundle
+
+
+def iter_company_bundles() -> Iterator[dict]:
+    """Yield bundles one file at a time (sorted by file name)"""
+    _ensure_dir()
+    for e in sorted(_scan_bundle_files().values(), key=lambda e: e.name):
+        try:
+            yield _read_json_file(e.path)
+        except Exception:
+            pass
+
+
+def list_company_bundles() -> List[dict]:
+    return list(iter_company_bundles())
+
+
+_BUNDLES_CACHE: Dict[str, Any] = {"key": None, "value": None}
+
+
+def get_bundles_indexed() -> tuple[List[dict], Dict[str, dict], Dict[str, tuple]]:
+    """
+    (bundles, by_company_id, by_domain_id) parsed once per on-disk state.
+    The cache key is every bundle file's (name, mtime_ns, size), so any
+    rewrite re-parses. Returned objects are shared: treat them as read-only.
+    """
+    _ensure_dir()
+    entries = sorted(_scan_bundle_files().values(), key=lambda e: e.name)
+    stats = []
+    for e in entries:
+        try:
+            st = e.stat()
+            stats.append((e.name, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stats.append((e.name, 0, 0))
+    key = tuple(stats)
+    if _BUNDLES_CACHE["key"] == key:
+        return _BUNDLES_CACHE["value"]
+    bundles = []
+    for e in entries:
+        try:
+            bundles.append(_read_json_file(e.path))
+        except Exception:
+            pass
+    by_company: Dict[str, dict] = {}
+    by_domain: Dict[str, tuple] = {}
+    for b in bundles:
+        by_company.setdefault(str(b.get("company_id")), b)
+        for d in b.get("domains") or []:
+            did = d.get("domain_id") or d.get("id") or d.get("domainId")
+            by_domain.setdefault(str(did), (b, d))
+    value = (bundles, by_company, by_domain)
+    _BUNDLES_CACHE["key"], _BUNDLES_CACHE["value"] = key, value
+    return value
+
+
+def write_company_bundle(company_id: Any, bundle: dict):
+    _ensure_dir()
+    _atomic_write_json(company_bundle_path(company_id), bundle)
+
+
+def build_company_bundle(company: dict, all_domains: List[dict]) -> dict:
+    """
+    Build a canonical bundle for a single company using live API data.
+    Includes: company record, risk grade, all category GPAs/scores,
+    company domains, per-domain score, and findings per category.
+    """
+    cid = company.get("company_id") or company.get("id")
+    if cid is None:
+        raise ValueError("Company has no ID")
+
+    # filter all domains to this company
+    sid = str(cid)
+    domains_for_company = [
+        d for d in (all_domains or []) if str(_domain_company_id(d)) == sid
+    ]
+    domain_ids = [
+        d.get("domain_id") or d.get("id") or d.get("domainId")
+        for d in domains_for_company
+    ]
+
+    # fetch: all API calls are independent, so overlap them in one pool
+    with ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as ex:
+        risk_fut = ex.submit(get_company_risk_grade, cid)
+        gpa_futs = [ex.submit(get_category_gpa, cid, cat) for cat in CATEGORY_NAMES]
+        score_futs = [ex.submit(_domain_score_or_none, did) for did in domain_ids]
+        findings_futs = [
+            [ex.submit(get_findings_by_category, did, cat) for cat in CATEGORY_NAMES]
+            for did in domain_ids
+        ]
+
+    # 1) risk grade
+    risk_grade = risk_fut.result() or {}
+
+    # 2) category GPAs/scores
+    categories = []
+    for cat, fut in zip(CATEGORY_NAMES, gpa_futs):
+        payload = fut.result()
+        row = payload[0] if isinstance(payload, list) and payload else payload
+        if not isinstance(row, dict):
+            row = {"Category": cat, "category_gpa": None, "category_score": None}
+        c_name = row.get("Category") or row.get("category") or cat
+        gpa = row.get("category_gpa") or row.get("gpa") or row.get("value")
+        score = row.get("category_score") or row.get("score")
+        aggregated_at = row.get("aggregated_at") or row.get("date") or None
+        try:
+            gpa = float(gpa) if gpa is not None else None
+        except Exception:
+            gpa = None
+        try:
+            score = float(score) if score is not None else None
+        except Exception:
+            score = None
+        categories.append(
+            {
+                "Category": c_name,
+                "category_gpa": gpa,
+                "category_score": score,
+                "aggregated_at": aggregated_at,
+            }
+        )
+
+    # 3) per-domain score + findings by category
+    domain_details = []
+    for d, did, score_fut, cat_futs in zip(
+        domains_for_company, domain_ids, score_futs, findings_futs
+    ):
+        dname = d.get("domain_name") or d.get("domain") or d.get("name")
+        dscore = score_fut.result()
+        try:
+            dscore = float(dscore) if dscore is not None else None
+        except Exception:
+            dscore = None
+
+        per_cat = {}
+        for cat, fut in zip(CATEGORY_NAMES, cat_futs):
+            raw = fut.result()
+            if isinstance(raw, dict) and isinstance(raw.get("findings"), list):
+                rows = raw.get("findings", [])
+            elif isinstance(raw, list):
+                rows = raw
+            elif isinstance(raw, dict) and raw:
+                rows = [raw]
+            else:
+                rows = []
+            rows = [r for r in rows if isinstance(r, dict)]
+            for r in rows:
+                r.pop("Category", None)  # avoid duplication
+            per_cat[cat] = rows
+
+        domain_details.append(
+            {
+                "domain_id": did,
+                "domain_name": dname,
+                "domain_score": dscore,
+                "findings_by_category": per_cat,
+            }
+        )
+
+    bundle = {
+        "schema_version": 1,
+        "generated_at": _now_iso(),
+        "company_id": cid,
+        "company": company,
+        "risk_grade": risk_grade,
+        "categories": categories,
+        "domains": domain_details,
+    }
+    # transport/meta keys are stripped in one walk over the assembled bundle
+    return _strip_transport(bundle)
+
+
+# --- Bulk / convenience builders ---------------------------------------------
+
+
+def build_all_company_bundles() -> list[str]:
+    """
+    Build/refresh one JSON per company into data/{company_id}_data.json
+    using the live API. Returns list of written file paths.
+    """
+    _ensure_dir()
+    cs = get_companies() or []
+    domains_by_cid = _domains_by_company(get_domains() or [])
+
+    def _build_and_write(c: dict) -> str:
+        cid = c.get("company_id") or c.get("id")
+        bundle = build_company_bundle(c, domains_by_cid.get(str(cid), []))
+        write_company_bundle(cid, bundle)
+        return company_bundle_path(cid)
+
+    todo = [c for c in cs if (c.get("company_id") or c.get("id")) is not None]
+    with ThreadPoolExecutor(max_workers=_BUILD_WORKERS) as ex:
+        return list(ex.map(_build_and_write, todo))
+
+
+def ensure_initial_bundles() -> int:
+    """
+    If data/ has no *"_data.json" files, build them all once.
+    Returns the number of bundles on disk after the call.
+    """
+    existing = list_company_bundles()
+    if existing:
+        return len(existing)
+    return len(build_all_company_bundles())
+
+
+def rebuild_company_bundle_for_id(company_id: int | str) -> str | None:
+    """
+    Rebuild a single company's JSON bundle from the live API.
+    Returns the path written, or None if the company isn't found.
+    """
+    cs = get_companies() or []
+    all_domains = get_domains() or []
+    for c in cs:
+        cid = c.get("company_id") or c.get("id")
+        if str(cid) == str(company_id):
+            bundle = build_company_bundle(c, all_domains)
+            write_company_bundle(cid, bundle)
+            return company_bundle_path(cid)
+    return None
+
+
+def _index_state() -> tuple[List[dict], Dict[str, List[dict]], Dict[str, float]]:
+    """
+    One snapshot of API companies, domains grouped by company id, and
+    bundle mtimes on disk (keyed by str company id).
+    """
+    _ensure_dir()
+    cs = get_companies() or []
+    domains_by_cid = _domains_by_company(get_domains() or [])
+    mtimes = {}
+    for cid, entry in _scan_bundle_files().items():
+        try:
+            mtimes[cid] = entry.stat().st_mtime
+        except Exception:
+            mtimes[cid] = 0
+    return cs, domains_by_cid, mtimes
+
+
+def _build_missing(state) -> int:
+    """Build bundles for snapshot companies with no file on disk"""
+    cs, domains_by_cid, mtimes = state
+    written = 0
+    for c in cs:
+        cid = c.get("company_id") or c.get("id")
+        if cid is None or str(cid) in mtimes:
+            continue
+        bundle = build_company_bundle(c, domains_by_cid.get(str(cid), []))
+        write_company_bundle(cid, bundle)
+        written += 1
+    return written
+
+
+def _refresh_stale(state, ttl_hours: int) -> int:
+    """Rebuild snapshot bundles older than ttl_hours"""
+    cs, domains_by_cid, mtimes = state
+    cutoff = time.time() - ttl_hours * 3600
+    # index companies by id for quick access
+    by_id = {str(c.get("company_id") or c.get("id")): c for c in cs}
+    refreshed = 0
+    for cid, mtime in mtimes.items():
+        if mtime >= cutoff:
+            continue  # fresh enough
+        comp = by_id.get(cid)
+        if not comp:
+            continue  # company no longer exists
+        bundle = build_company_bundle(comp, domains_by_cid.get(cid, []))
+        write_company_bundle(cid, bundle)
+        refreshed += 1
+    return refreshed
+
+
+def ensure_missing_bundles() -> int:
+    """
+    Build bundles only for companies that don't yet have data/{id}_data.json.
+    Returns how many new files were written.
+    """
+    return _build_missing(_index_state())
+
+
+def refresh_stale_bundles(ttl_hours: int = 24) -> int:
+    """
+    Rebuild bundles whose files are older than ttl_hours.
+    Returns how many files were refreshed.
+    """
+    return _refresh_stale(_index_state(), ttl_hours)
+
+
+def warmup_bundles(ttl_hours: int = 24) -> tuple[int, int]:
+    """
+    Build missing bundles and refresh stale ones from a single API/disk snapshot.
+    Returns (written, refreshed).
+    """
+    state = _index_state()
+    return _build_missing(state), _refresh_stale(state, ttl_hours)
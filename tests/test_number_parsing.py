@@ -0,0 +1,59 @@
+###
+# File: tests/test_number_parsing.py
+# Description: Tests for number parsing in rating/score extraction.
+###
+
+import unittest
+
+from helpers import extract_rating
+from utils.dataframe_utils import extract_number
+from utils.normalization import parse_number
+
+
+class ParseNumberTests(unittest.TestCase):
+    def test_single_number(self):
+        self.assertEqual(parse_number("Level 3"), 3.0)
+        self.assertEqual(parse_number("-1.5e2"), -150.0)
+
+    def test_thousands_separator(self):
+        self.assertEqual(parse_number("1,234.5"), 1234.5)
+
+    def test_no_number_or_several_numbers(self):
+        self.assertIsNone(parse_number("n/a"))
+        self.assertIsNone(parse_number("3-4"))
+        self.assertIsNone(parse_number("Level 3 of 4"))
+
+
+class ExtractRatingTests(unittest.TestCase):
+    def test_numeric_values(self):
+        self.assertEqual(extract_rating({"cmm_rating": 2}), 2.0)
+        self.assertEqual(extract_rating({"rating": 2.5}), 2.5)
+
+    def test_string_values(self):
+        self.assertEqual(extract_rating({"cmm_rating": "1,234.5"}), 1234.5)
+        self.assertEqual(extract_rating({"cmm_rating": "Level 3"}), 3.0)
+
+    def test_ambiguous_string_falls_through_to_next_key(self):
+        self.assertIsNone(extract_rating({"cmm_rating": "3-4"}))
+        self.assertEqual(extract_rating({"cmm_rating": "3-4", "rating": "2"}), 2.0)
+
+
+class ExtractNumberTests(unittest.TestCase):
+    def test_plain_values(self):
+        self.assertEqual(extract_number(3), 3.0)
+        self.assertEqual(extract_number("2.5"), 2.5)
+        self.assertIsNone(extract_number(None))
+
+    def test_string_fallback(self):
+        self.assertEqual(extract_number("1,234.5"), 1234.5)
+        self.assertEqual(extract_number("abc 3"), 3.0)
+        self.assertIsNone(extract_number("3-4"))
+        self.assertIsNone(extract_number("abc"))
+
+    def test_dict_values(self):
+        self.assertEqual(extract_number({"score": "B 2"}), 2.0)
+        self.assertEqual(extract_number({"domain_score": "n/a", "score": 4}), 4.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
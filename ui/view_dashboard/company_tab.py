@@ -1,179 +1,220 @@
-###
-# File: ui/view_dashboard/company_tab.py
-# Description: Renders the Company tab for PCP project dashboard UI.
-###
-
-import streamlit as st
-import pandas as pd
-from utils.dataframe_utils import to_df, stringify_nested
-from services import get_company_category_scores_df, company_summary
-from charts.charts_mixed import company_category_scores_chart
-from nist.nist_helpers import summarize_csf_for_category
-from json_handler import load_company_bundle
-
-
-# ---------- helpers to shape tables like the screenshot ----------
-
-
-def _domains_table(
-    selected_company_id: int, company_domains: list[dict]
-) -> pd.DataFrame:
-    # Function: _domains_table
-    # Description: Builds a table with domain info and first/last seen dates for the selected company.
-    # Usage: _domains_table(selected_company_id, company_domains)
-    # Returns: DataFrame with domain info
-    """Prepare rows for each domain"""
-    rows = []
-    for d in company_domains or []:
-        did = d.get("domain_id") or d.get("id") or d.get("domainId")  # Get domain ID
-        name = (
-            d.get("domain_name") or d.get("domain") or d.get("name")
-        )  # Get domain name
-
-        """Derive first/last seen dates from findings"""
-        fbc = d.get("findings_by_category") or {}
-        dates = []
-        for lst in fbc.values():
-            for r in lst or []:
-                dt = r.get("found_date") or r.get("date") or r.get("scan_date")
-                if dt:
-                    dates.append(str(dt))
-        first_seen = min(dates) if dates else None  # Earliest date
-        last_seen = max(dates) if dates else None  # Latest date
-
-        """Add domain info to rows"""
-        rows.append(
-            {
-                "domain_id": did,
-                "company_id": int(selected_company_id) if selected_company_id else None,
-                "domain_name": name,
-                "source": "synthetic",  # label per your screenshot
-                "first_seen": first_seen,
-                "last_seen": last_seen,
-            }
-        )
-
-    """Create DataFrame from rows"""
-    df = pd.DataFrame(
-        rows,
-        columns=[
-            "domain_id",
-            "company_id",
-            "domain_name",
-            "source",
-            "first_seen",
-            "last_seen",
-        ],
-    )
-    return df
-
-
-def _category_scores_table(selected_company_id: int) -> pd.DataFrame:
-    """Builds a table with company category scores, GPA, and NIST CSF identifiers for the selected company."""
-    scores = get_company_category_scores_df(selected_company_id)
-    if scores is None or scores.empty:
-        """Return empty DataFrame if no scores"""
-        return pd.DataFrame(
-            columns=[
-                "company_id",
-                "Category",
-                "nist_csf_identifiers",
-                "category_gpa",
-                "category_score",
-                "aggregated_at",
-            ]
-        )
-
-    """Get aggregated_at from bundle"""
-    bundle = load_company_bundle(selected_company_id) or {}
-    cats = pd.DataFrame(bundle.get("categories") or [])
-    cats = (
-        cats[["Category", "aggregated_at"]]
-        if not cats.empty
-        else pd.DataFrame(columns=["Category", "aggregated_at"])
-    )
-
-    """Merge scores and aggregated_at"""
-    df = scores.merge(cats, on="Category", how="left")
-
-    """Add company_id and NIST CSF identifiers columns"""
-    df.insert(0, "company_id", int(selected_company_id))
-    df.insert(
-        2,
-        "nist_csf_identifiers",
-        df["Category"].map(
-            lambda c: (summarize_csf_for_category(c) or {}).get("nist_csf_identifiers")
-        ),
-    )
-
-    """Tidy up numeric columns"""
-    if "category_score" in df.columns:
-        df["category_score"] = (
-            pd.to_numeric(df["category_score"], errors="coerce")
-            .round(0)
-            .astype("Int64")
-        )
-    if "category_gpa" in df.columns:
-        df["category_gpa"] = pd.to_numeric(df["category_gpa"], errors="coerce")
-
-    """Final column order"""
-    df = df[
-        [
-            "company_id",
-            "Category",
-            "nist_csf_identifiers",
-            "category_gpa",
-            "category_score",
-            "aggregated_at",
-        ]
-    ]
-    """Return the DataFrame"""
-    return df
-
-
-# ---------- main render ----------
-
-
-def render_company_tab(companies_payload, selected_company_id, company_domains):
-    """Renders the 'Company' tab with KPIs, company details, domains, category scores, and category graph using Streamlit."""
-    """Show KPI row (bundle-backed)"""
-    agg = company_summary(selected_company_id)
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Risk Grade", agg["grade"])
-    c2.metric("Total GPA", agg["total_gpa"])
-    c3.metric("Domains", len(company_domains))
-    c4.metric("Last Calculated", agg["calculated_date"])
-
-    """Show company details (single-row table)"""
-    row = next(
-        (
-            c
-            for c in companies_payload
-            if str(c.get("company_id") or c.get("id")) == str(selected_company_id)
-        ),
-        {},
-    )
-    df1 = stringify_nested(to_df(row)) if row else pd.DataFrame()
-    if df1.empty:
-        st.info("No data.")
-    else:
-        st.dataframe(df1, use_container_width=True)  # show row index
-
-    """Show company domains (exact shape like screenshot)"""
-    with st.expander("Company Domains", expanded=True):
-        if not company_domains:
-            st.info("No domains.")
-        else:
-            dom_df = _domains_table(selected_company_id, company_domains)
-            st.dataframe(dom_df, use_container_width=True)  # show row index
-
-    """Show company category GPA & scores (exact shape like screenshot)"""
-    with st.expander("Company Category GPA & Scores", expanded=True):
-        if not selected_company_id:
-            st.info("Select a company to view Category GPA.")
-        else:
-            cat_df = _category_scores_table(selected_company_id)
-            if cat_df.empty:
-                st.info("No Category GPA data available.")
-            else:
-                st.dataframe(cat_df, use_container_width=True)  # show row index
+###
+# File: ui/view_dashboard/company_tab.py
+# Description: Renders the Company tab for PCP project dashboard UI.
+###
+
+import json
+import streamlit as st
+import pandas as pd
+from utils.dataframe_utils import to_df, stringify_nested
+from services import get_company_category_scores_df, company_summary
+from charts.charts_mixed import company_category_scores_chart
+from nist.nist_helpers import summarize_csf_for_category
+from json_handler import load_company_bundle
+
+
+# ---------- helpers to shape tables like the screenshot ----------
+
+_DOMAIN_COLUMNS = [
+    "domain_id",
+    "company_id",
+    "domain_name",
+    "source",
+    "first_seen",
+    "last_seen",
+]
+_CATEGORY_COLUMNS = [
+    "company_id",
+    "Category",
+    "nist_csf_identifiers",
+    "category_gpa",
+    "category_score",
+    "aggregated_at",
+]
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_company_summary(company_id) -> dict:
+    # Function: _cached_company_summary
+    # Description: company_summary reused across reruns for up to 60 seconds.
+    # Usage: _cached_company_summary(company_id)
+    # Returns: dict with grade, total_gpa, calculated_date
+    return company_summary(company_id)
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _single_row_df(row: dict) -> pd.DataFrame:
+    # Function: _single_row_df
+    # Description: One-row display DataFrame for a JSON record (nested values as JSON strings).
+    # Usage: _single_row_df(row)
+    # Returns: DataFrame equal to stringify_nested(to_df(row))
+    """Anything beyond plain JSON values goes through the generic path"""
+    if not all(isinstance(v, (dict, list) + _JSON_SCALARS) for v in row.values()):
+        return stringify_nested(to_df(row), copy=False)
+    """JSON scalars already display as-is; only nested values need stringifying"""
+    return pd.DataFrame(
+        {
+            k: [json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v]
+            for k, v in row.items()
+        }
+    )
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_category_scores_table(company_id) -> pd.DataFrame:
+    # Function: _cached_category_scores_table
+    # Description: _category_scores_table reused across reruns for up to 60 seconds.
+    # Usage: _cached_category_scores_table(company_id)
+    # Returns: DataFrame with category scores, GPA and NIST CSF identifiers
+    return _category_scores_table(company_id)
+
+
+def _domains_table(
+    selected_company_id: int, company_domains: list[dict]
+) -> pd.DataFrame:
+    # Function: _domains_table
+    # Description: Builds a table with domain info and first/last seen dates for the selected company.
+    # Usage: _domains_table(selected_company_id, company_domains)
+    # Returns: DataFrame with domain info
+    domains = list(company_domains or [])
+    n = len(domains)
+    if not n:
+        return pd.DataFrame(columns=_DOMAIN_COLUMNS)
+    """Derive first/last seen dates from findings: one flat (domain index, date) pass"""
+    seen = pd.DataFrame(
+        [
+            (i, str(dt))
+            for i, d in enumerate(domains)
+            for lst in (d.get("findings_by_category") or {}).values()
+            for r in lst or []
+            for dt in (r.get("found_date") or r.get("date") or r.get("scan_date"),)
+            if dt
+        ],
+        columns=["idx", "dt"],
+    )
+    """Order by the parsed timestamp (one vectorized parse); unparseable dates sort as strings after"""
+    try:
+        seen["ts"] = pd.to_datetime(
+            seen["dt"], errors="coerce", utc=True, format="mixed"
+        )
+    except (TypeError, ValueError):
+        seen["ts"] = pd.NaT
+    by_idx = ["idx", "ts", "dt"]
+    first = seen.sort_values(by_idx, na_position="last").groupby("idx")["dt"].first()
+    last = seen.sort_values(by_idx, na_position="first").groupby("idx")["dt"].last()
+    """Earliest/latest date string per domain (None when a domain has no dates)"""
+    bounds = pd.DataFrame({"min": first, "max": last}).reindex(range(n)).astype(object)
+    bounds = bounds.where(bounds.notna(), None)
+
+    """Build the table column-wise (no per-row dicts)"""
+    cid = int(selected_company_id) if selected_company_id else None
+    df = pd.DataFrame(
+        {
+            "domain_id": [
+                d.get("domain_id") or d.get("id") or d.get("domainId") for d in domains
+            ],
+            "company_id": [cid] * n,
+            "domain_name": [
+                d.get("domain_name") or d.get("domain") or d.get("name")
+                for d in domains
+            ],
+            "source": ["synthetic"] * n,  # label per your screenshot
+            "first_seen": bounds["min"].tolist(),
+            "last_seen": bounds["max"].tolist(),
+        }
+    )
+    return df
+
+
+def _category_scores_table(selected_company_id: int) -> pd.DataFrame:
+    """Builds a table with company category scores, GPA, and NIST CSF identifiers for the selected company."""
+    scores = get_company_category_scores_df(selected_company_id)
+    if scores is None or scores.empty:
+        """Return empty DataFrame if no scores"""
+        return pd.DataFrame(columns=_CATEGORY_COLUMNS)
+
+    """Get aggregated_at from bundle"""
+    bundle = load_company_bundle(selected_company_id) or {}
+    cats = pd.DataFrame(bundle.get("categories") or [])
+    cats = (
+        cats[["Category", "aggregated_at"]]
+        if not cats.empty
+        else pd.DataFrame(columns=["Category", "aggregated_at"])
+    )
+
+    """Attach aggregated_at (index join when categories are unique, else merge)"""
+    if cats["Category"].is_unique:
+        df = scores.join(cats.set_index("Category"), on="Category", how="left")
+    else:
+        df = scores.merge(cats, on="Category", how="left")
+
+    """Add company_id and NIST CSF identifiers columns (placed by the final reorder)"""
+    df["company_id"] = int(selected_company_id)
+    """Summarize each distinct category once, then map"""
+    csf_map = {
+        c: (summarize_csf_for_category(c) or {}).get("nist_csf_identifiers")
+        for c in df["Category"].unique()
+    }
+    df["nist_csf_identifiers"] = df["Category"].map(csf_map)
+
+    """Tidy up numeric columns"""
+    if "category_score" in df.columns:
+        df["category_score"] = (
+            pd.to_numeric(df["category_score"], errors="coerce")
+            .round(0)
+            .astype("Int64")
+        )
+    if "category_gpa" in df.columns:
+        df["category_gpa"] = pd.to_numeric(df["category_gpa"], errors="coerce")
+
+    """Final column order"""
+    df = df[_CATEGORY_COLUMNS]
+    """Return the DataFrame"""
+    return df
+
+
+# ---------- main render ----------
+
+
+def render_company_tab(companies_payload, selected_company_id, company_domains):
+    """Renders the 'Company' tab with KPIs, company details, domains, category scores, and category graph using Streamlit."""
+    """Show KPI row (bundle-backed)"""
+    agg = _cached_company_summary(selected_company_id)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Risk Grade", agg["grade"])
+    c2.metric("Total GPA", agg["total_gpa"])
+    c3.metric("Domains", len(company_domains))
+    c4.metric("Last Calculated", agg["calculated_date"])
+
+    """Show company details (single-row table); the selected id is stringified once"""
+    sid = str(selected_company_id)
+    row = next(
+        (c for c in companies_payload if str(c.get("company_id") or c.get("id")) == sid),
+        {},
+    )
+    df1 = _single_row_df(row) if row else pd.DataFrame()
+    if df1.empty:
+        st.info("No data.")
+    else:
+        st.dataframe(df1, use_container_width=True)  # show row index
+
+    """Show company domains (exact shape like screenshot)"""
+    with st.expander("Company Domains", expanded=True):
+        if not company_domains:
+            st.info("No domains.")
+        else:
+            dom_df = _domains_table(selected_company_id, company_domains)
+            st.dataframe(dom_df, use_container_width=True)  # show row index
+
+    """Show company category GPA & scores (exact shape like screenshot)"""
+    with st.expander("Company Category GPA & Scores", expanded=True):
+        if not selected_company_id:
+            st.info("Select a company to view Category GPA.")
+        else:
+            cat_df = _cached_category_scores_table(selected_company_id)
+            if cat_df.empty:
+                st.info("No Category GPA data available.")
+            else:
+                st.dataframe(cat_df, use_container_width=True)  # show row index
@@ -1,81 +1,142 @@
-###
-# File: ui/view_dashboard/nist_finding_tab.py
-# Description: Renders the CSF tab for PCP project dashboard UI.
-###
-
-import streamlit as st
-from services import get_company_category_scores_df
-from api import get_internal_scan
-from charts.internal_csf_charts import (
-    csf_maturity_line_chart,
-    build_csf_controls_table_df,
-)
-from charts.nist_finding_tab_L2_mapping_table import render_l2_domains_table
-from charts.charts_mixed import external_findings_chart_grouped
-from charts.external_csf_charts import internal_controls_cmm_bar_chart
-from charts.distribution_l1_csf_charts import distribution_l1_function_bar_chart
-
-
-def render_nist_finding_tab(selected_company_id, company_domains):
-    """Renders the CSF tab with all dashboard visualizations for a selected company."""
-    # Step 1: Check if a company is selected
-    if not selected_company_id:
-        st.info("Select a company to view CSF maturity.")
-        return
-
-    # Step 2: Load scores dataframe and internal scan rows
-    scores_df = get_company_category_scores_df(selected_company_id)
-    try:
-        internal_rows = get_internal_scan(limit=2000)  # control_ref + cmm_rating (etc.)
-    except Exception:
-        internal_rows = []
-
-    # Step 3: Mix Findings section (grouped horizontal GPA/CMM)
-    with st.expander("Mix Findings", expanded=True):
-        chart = external_findings_chart_grouped(selected_company_id, internal_rows)
-        if chart is None:
-            st.info("No category scores available.")
-        else:
-            st.altair_chart(chart, use_container_width=True)
-
-    # Step 4: External Findings section
-    with st.expander("External Findings", expanded=True):
-        chart = csf_maturity_line_chart(selected_company_id)
-        if chart is not None:
-            st.altair_chart(chart, use_container_width=True)
-        else:
-            st.info("No findings GPA data available for this company.")
-
-    # Step 5: Internal Controls (CMM) section
-    with st.expander("Internal Findings", expanded=True):
-        cmm_chart = internal_controls_cmm_bar_chart(selected_company_id)
-        if cmm_chart is not None:
-            st.altair_chart(cmm_chart, use_container_width=True)
-        else:
-            st.info("No internal controls CMM data available for this company.")
-
-    # Step 6: L1 Function Distribution section
-    with st.expander("L1 Function Distribution (Control Count)", expanded=True):
-        l1_chart = distribution_l1_function_bar_chart(selected_company_id)
-        if l1_chart is not None:
-            st.altair_chart(l1_chart, use_container_width=True)
-        else:
-            st.info(
-                "No eligible controls found to compute L1 distribution for this company."
-            )
-
-    # Step 7: Controls & CMM Table section
-    with st.expander("CSF — Controls & CMM Table", expanded=True):
-        df = build_csf_controls_table_df(
-            scores_df=scores_df,
-            internal_rows=internal_rows,
-            company_id=selected_company_id,
-        )
-        if df is None or df.empty:
-            st.info("No control-level CMM ratings available to display.")
-        else:
-            st.dataframe(df, use_container_width=True)
-
-    # Step 8: L2 Domains table section
-    with st.expander("NIST CSF L2 Domains Table", expanded=True):
-        render_l2_domains_table(selected_company_id)
+###
+# File: ui/view_dashboard/nist_finding_tab.py
+# Description: Renders the CSF tab for PCP project dashboard UI.
+###
+
+import hashlib
+import json
+import streamlit as st
+from services import get_company_category_scores_df
+from api import get_internal_scan
+from charts.internal_csf_charts import (
+    csf_maturity_line_chart,
+    build_csf_controls_table_df,
+)
+from charts.nist_finding_tab_L2_mapping_table import render_l2_domains_table
+from charts.charts_mixed import external_findings_chart_grouped
+from charts.external_csf_charts import internal_controls_cmm_bar_chart
+from charts.distribution_l1_csf_charts import distribution_l1_function_bar_chart
+
+# Per-company charts (cached across reruns; scan rows are fetched once by the tab).
+_COMPANY_CHARTS = {
+    "mix": external_findings_chart_grouped,
+    "external": csf_maturity_line_chart,
+    "internal": internal_controls_cmm_bar_chart,
+    "l1": distribution_l1_function_bar_chart,
+}
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_company_chart(kind, company_id, scan_fingerprint, _internal_rows=None):
+    # Function: _cached_company_chart
+    # Description: Builds one of the per-company CSF charts as a Vega-Lite spec, reused across reruns for up to 60 seconds.
+    # Usage: _cached_company_chart("mix" | "external" | "internal" | "l1", company_id, scan_fingerprint, internal_rows)
+    # Returns: Vega-Lite spec dict or None (the scan enters the cache key only via its content fingerprint)
+    chart = _COMPANY_CHARTS[kind](company_id, internal_rows=_internal_rows)
+    """Serialize once here; st.altair_chart would re-validate the spec every rerun"""
+    return None if chart is None else chart.to_dict()
+
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def _cached_internal_scan(limit=2000):
+    # Function: _cached_internal_scan
+    # Description: get_internal_scan reused across reruns for up to 5 minutes (failures are not cached).
+    # Usage: rows, fingerprint = _cached_internal_scan(limit=2000)
+    # Returns: tuple (list of internal scan rows, content fingerprint used as a chart cache key)
+    rows = get_internal_scan(limit=limit)
+    """Fingerprint the content once per fetch, so changed rows give a new chart key"""
+    raw = json.dumps(rows, sort_keys=True, default=str).encode("utf-8")
+    return rows, hashlib.sha1(raw).hexdigest()
+
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def _cached_scores(company_id):
+    # Function: _cached_scores
+    # Description: get_company_category_scores_df reused across reruns for up to 5 minutes.
+    # Usage: _cached_scores(company_id)
+    # Returns: pandas DataFrame with category scores and GPA
+    return get_company_category_scores_df(company_id)
+
+
+@st.fragment
+def _l2_domains_fragment(selected_company_id):
+    # Function: _l2_domains_fragment
+    # Description: L2 toggle and table as a fragment, so flipping the toggle reruns only this section.
+    # Usage: _l2_domains_fragment(selected_company_id)
+    # Returns: None
+    if st.toggle("Show L2 domain maturity", key="show_l2_table"):
+        render_l2_domains_table(selected_company_id)
+
+
+def render_nist_finding_tab(selected_company_id, company_domains):
+    """Renders the CSF tab with all dashboard visualizations for a selected company."""
+    # Step 1: Check if a company is selected
+    if not selected_company_id:
+        st.info("Select a company to view CSF maturity.")
+        return
+
+    # Step 2: Load scores dataframe and internal scan rows
+    scores_df = _cached_scores(selected_company_id)
+    try:
+        # control_ref + cmm_rating (etc.)
+        internal_rows, scan_fingerprint = _cached_internal_scan(limit=2000)
+    except Exception:
+        internal_rows, scan_fingerprint = [], None
+
+    # Step 3: Mix Findings section (grouped horizontal GPA/CMM)
+    with st.expander("Mix Findings", expanded=True):
+        chart = _cached_company_chart(
+            "mix", selected_company_id, scan_fingerprint, internal_rows
+        )
+        if chart is None:
+            st.info("No category scores available.")
+        else:
+            st.vega_lite_chart(spec=chart, use_container_width=True)
+
+    # Step 4: External Findings section
+    with st.expander("External Findings", expanded=True):
+        chart = _cached_company_chart(
+            "external", selected_company_id, scan_fingerprint, internal_rows
+        )
+        if chart is not None:
+            st.vega_lite_chart(spec=chart, use_container_width=True)
+        else:
+            st.info("No findings GPA data available for this company.")
+
+    # Step 5: Internal Controls (CMM) section
+    with st.expander("Internal Findings", expanded=True):
+        cmm_chart = _cached_company_chart(
+            "internal", selected_company_id, scan_fingerprint, internal_rows
+        )
+        if cmm_chart is not None:
+            st.vega_lite_chart(spec=cmm_chart, use_container_width=True)
+        else:
+            st.info("No internal controls CMM data available for this company.")
+
+    # Step 6: L1 Function Distribution section
+    with st.expander("L1 Function Distribution (Control Count)", expanded=True):
+        l1_chart = _cached_company_chart(
+            "l1", selected_company_id, scan_fingerprint, internal_rows
+        )
+        if l1_chart is not None:
+            st.vega_lite_chart(spec=l1_chart, use_container_width=True)
+        else:
+            st.info(
+                "No eligible controls found to compute L1 distribution for this company."
+            )
+
+    # Step 7: Controls & CMM Table section
+    with st.expander("CSF — Controls & CMM Table", expanded=True):
+        df = build_csf_controls_table_df(
+            scores_df=scores_df,
+            internal_rows=internal_rows,
+            company_id=selected_company_id,
+        )
+        if df is None or df.empty:
+            st.info("No control-level CMM ratings available to display.")
+        else:
+            st.dataframe(df, use_container_width=True)
+
+    # Step 8: L2 Domains table section (only computed once the user asks for it)
+    with st.expander("NIST CSF L2 Domains Table", expanded=False):
+        _l2_domains_fragment(selected_company_id)
@@ -1,71 +1,105 @@
-###
-# File: utils/normalization.py
-# Description: Utility functions for normalizing scores and extracting prefixes from control references.
-###
-
-from typing import Optional
-
-
-def norm_ref(s: Optional[str]) -> str:
-    # Function: norm_ref
-    # Description: Normalizes control references to a standard format (e.g. PR-PS-1 → PR.PS-01).
-    # Usage: norm_ref('PR-PS-1')
-    # Returns: str - normalized control reference
-    """Handle empty input"""
-    if not s:
-        return ""
-    """ Convert input to uppercase string and remove leading/trailing spaces """
-    s = str(s).upper().strip()
-    """ If input contains a dash, split into prefix and tail """
-    if "-" in s:
-        prefix, tail = s.split("-", 1)
-        """ Replace underscores and dashes in prefix with dots """
-        prefix = prefix.replace("_", ".").replace("-", ".")
-        """ Remove any double dots """
-        while ".." in prefix:
-            prefix = prefix.replace("..", ".")
-        tail = tail.strip()
-        """ If tail is a number, pad with zero if needed """
-        if tail.isdigit():
-            tail = tail.zfill(2)
-        """ Return normalized format """
-        return f"{prefix}-{tail}"
-    """ If no dash, replace underscores/dashes with dots """
-    s2 = s.replace("_", ".").replace("-", ".")
-    """ Remove any double dots """
-    while ".." in s2:
-        s2 = s2.replace("..", ".")
-    """ Split into parts by dot """
-    parts = [p for p in s2.split(".") if p]
-    """ If third part is a number, format accordingly """
-    if len(parts) >= 3 and parts[2].isdigit():
-        return f"{parts[0]}.{parts[1]}-{parts[2].zfill(2)}"
-    """ Return original string if no formatting applied """
-    return s
-
-
-def prefix(x: Optional[str]) -> str:
-    # Function: prefix
-    # Description: Returns the prefix from a control reference (e.g. PR.PS-01 → PR.PS).
-    # Usage: prefix('PR.PS-01')
-    # Returns: str - prefix portion of control reference
-    """Handle empty input"""
-    if not x:
-        return ""
-    """ Convert input to uppercase string and remove leading/trailing spaces """
-    x = str(x).upper().strip()
-    """ If input contains a dash, keep only the part before the dash """
-    if "-" in x:
-        x = x.split("-", 1)[0]
-    """ Replace underscores and dashes with dots """
-    x = x.replace("_", ".").replace("-", ".")
-    """ Remove any double dots """
-    while ".." in x:
-        x = x.replace("..", ".")
-    """ Split into parts by dot """
-    parts = [p for p in x.split(".") if p]
-    """ If there are at least two parts, return them joined by a dot """
-    if len(parts) >= 2:
-        return f"{parts[0]}.{parts[1]}"
-    """ Otherwise, return the first part or empty string """
-    return parts[0] if parts else ""
+###
+# File: utils/normalization.py
+# Description: Utility functions for normalizing scores and extracting prefixes from control references.
+###
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Runs of separators collapse to a single dot (dashes are handled by the callers).
+_SEP_RE = re.compile(r"[._]+")
+
+# Signed decimal number in a string (e.g. "Level 3" -> 3, "-1.5e2" -> -150).
+_NUM_RE = re.compile(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?")
+
+
+def norm_ref(s: Optional[str]) -> str:
+    # Function: norm_ref
+    # Description: Normalizes control references to a standard format (e.g. PR-PS-1 → PR.PS-01).
+    # Usage: norm_ref('PR-PS-1')
+    # Returns: str - normalized control reference
+    """Handle empty input"""
+    if not s:
+        return ""
+    return _norm_ref_str(str(s))
+
+
+@lru_cache(maxsize=4096)
+def _norm_ref_str(s: str) -> str:
+    """ Convert input to uppercase string and remove leading/trailing spaces """
+    s = s.upper().strip()
+    """ If input contains a dash, split into prefix and tail """
+    if "-" in s:
+        prefix, tail = s.split("-", 1)
+        """ Collapse underscores and dot runs in prefix to single dots """
+        prefix = _SEP_RE.sub(".", prefix)
+        tail = tail.strip()
+        """ If tail is a number, pad with zero if needed """
+        if tail.isdigit():
+            tail = tail.zfill(2)
+        """ Return normalized format """
+        return f"{prefix}-{tail}"
+    """ If no dash, collapse underscores and dot runs to single dots """
+    s2 = _SEP_RE.sub(".", s)
+    """ Split into parts by dot """
+    parts = [p for p in s2.split(".") if p]
+    """ If third part is a number, format accordingly """
+    if len(parts) >= 3 and parts[2].isdigit():
+        return f"{parts[0]}.{parts[1]}-{parts[2].zfill(2)}"
+    """ Return original string if no formatting applied """
+    return s
+
+
+def prefix(x: Optional[str]) -> str:
+    # Function: prefix
+    # Description: Returns the prefix from a control reference (e.g. PR.PS-01 → PR.PS).
+    # Usage: prefix('PR.PS-01')
+    # Returns: str - prefix portion of control reference
+    """Handle empty input"""
+    if not x:
+        return ""
+    return _prefix_str(str(x))
+
+
+@lru_cache(maxsize=4096)
+def _prefix_str(x: str) -> str:
+    """ Convert input to uppercase string and remove leading/trailing spaces """
+    x = x.upper().strip()
+    """ If input contains a dash, keep only the part before the dash """
+    if "-" in x:
+        x = x.split("-", 1)[0]
+    """ Collapse underscores and dot runs to single dots """
+    x = _SEP_RE.sub(".", x)
+    """ Split into parts by dot """
+    parts = [p for p in x.split(".") if p]
+    """ If there are at least two parts, return them joined by a dot """
+    if len(parts) >= 2:
+        return f"{parts[0]}.{parts[1]}"
+    """ Otherwise, return the first part or empty string """
+    return parts[0] if parts else ""
+
+
+def norm_ref_series(s: pd.Series) -> pd.Series:
+    # Function: norm_ref_series
+    # Description: Applies norm_ref to a Series, normalizing each distinct string once.
+    # Usage: norm_ref_series(df["control_ref"])
+    # Returns: pandas Series (object dtype) aligned with s
+    """Hash-based de-duplication is only exact for all-string columns (3 == 3.0 == True)"""
+    if pd.api.types.infer_dtype(s, skipna=False) != "string":
+        return s.map(norm_ref)
+    codes, uniques = pd.factorize(s, use_na_sentinel=False)
+    normed = np.array([norm_ref(u) for u in uniques], dtype=object)
+    return pd.Series(normed[codes], index=s.index, dtype=object)
+
+
+def parse_number(s: str) -> Optional[float]:
+    # Function: parse_number
+    # Description: Parses the single number in a string, ignoring thousands separators (e.g. "Level 3" → 3, "1,234.5" → 1234.5).
+    # Usage: parse_number('Level 3')
+    # Returns: float, or None when the string holds no number or more than one (e.g. "3-4")
+    nums = _NUM_RE.findall(s.replace(",", ""))
+    return float(nums[0]) if len(nums) == 1 else None